@@ -1,3 +1,4 @@
+import sys
 import time
 import cv2 as cv
 import numpy as np
@@ -18,8 +19,11 @@ class VirtualCanvas:
 
     ESC_KEY = 27  # Escape key to exit
     FRAME_DELAY = 1  # Delay in milliseconds for frame processing
+    DISPLAY_INTERVAL = 1 / 60  # Seconds between window updates (60 Hz)
+    THREAD_SWITCH_INTERVAL = 0.001  # Seconds before the GIL is handed over
 
     CANVAS_SIZE_MULTIPLIER = 0.79  # 80% of the camera frame
+    CANVAS_DOWNSCALE = 0.5  # Strokes are drawn at half the shown resolution
     CANVAS_OFFSET_X = 0.05  # 5% from left
     CANVAS_OFFSET_Y = 0.20  # 20% from top
 
@@ -36,9 +40,9 @@ class VirtualCanvas:
     BOARD_TOOGLE_OFFSET_X = 0.1  # 10% from top
     PEN_TOGGLE_OFFSET_X = 0.9  # 90% from Left
 
-    FRAME_WEIGHT = 0.5  # Weight for blending canvas with frame
-    CANVAS_WEIGHT = 0.5  # Weight for blending frame with canvas
-    BRIGHTNESS_ADJUSTMENT = 0.5  # Brightness adjustment for blending
+    MASK_DRAWN = 255  # Mask value for painted canvas pixels
+    MASK_EMPTY = 0  # Mask value for untouched or erased canvas pixels
+    CANVAS_BORDER_THICKNESS = 2  # Outline showing the board area
 
     def __init__(self):
         """Initialize the virtual canvas application."""
@@ -46,11 +50,28 @@ class VirtualCanvas:
         self.tracker = HandTracker()
         self.menu = None
 
-        # Canvas properties
+        # Canvas properties, drawn at CANVAS_DOWNSCALE resolution
         self.canvas = None
+        self.canvas_mask = None  # Marks which canvas pixels were drawn
+        self.canvas_dirty = False  # Set when the display copy is outdated
         self.canvas_size = None
         self.canvas_origin = None
 
+        # Canvas geometry unpacked once for the per-frame hot path
+        self.canvas_top = None
+        self.canvas_left = None
+        self.canvas_height = None
+        self.canvas_width = None
+        self.canvas_rows = None
+        self.canvas_cols = None
+
+        # Canvas upscaled to its on-screen size, refreshed when dirty
+        self.display_canvas = None
+        self.display_canvas_mask = None
+
+        # Reused output buffer for the mirrored camera frame
+        self.flip_buffer = None
+
         # Drawing state
         self.current_color = COLORS[0]  # Start with red
         self.brush_size = self.DEFAULT_BRUSH_SIZE
@@ -64,8 +85,26 @@ class VirtualCanvas:
         self.show_brush_sizes = False
         self.is_eraser = False
 
+        # Display state
+        self.last_show_time = 0.0
+
+        # OpenCV functions used every frame, bound once to skip the module
+        # attribute lookup on each call
+        self.cv_flip = cv.flip
+        self.cv_imshow = cv.imshow
+        self.cv_wait_key = cv.waitKey
+        self.cv_copy_to = cv.copyTo
+        self.cv_resize = cv.resize
+        self.cv_rectangle = cv.rectangle
+        self.cv_line = cv.line
+        self.cv_circle = cv.circle
+
     def initialize(self):
         """Initialize camera and UI components."""
+        # Hand the GIL over sooner so the capture thread is not starved by
+        # the drawing and GUI work on the main thread
+        sys.setswitchinterval(self.THREAD_SWITCH_INTERVAL)
+
         self.camera.start()
 
         try:
@@ -76,6 +115,7 @@ class VirtualCanvas:
 
         self.setup_menu()
         self.setup_canvas()
+        self.setup_frame_buffers()
 
     def wait_for_camera(self):
         """Wait until the camera is ready."""
@@ -105,9 +145,47 @@ class VirtualCanvas:
             int(self.camera.width * self.CANVAS_OFFSET_X),  # 5% from left
         )
 
-        height, width = self.canvas_size
-        self.canvas = np.zeros((height, width, 3), dtype=np.uint8)
-        self.canvas[:] = WHITE  # White background
+        self.canvas_top, self.canvas_left = self.canvas_origin
+        self.canvas_height, self.canvas_width = self.canvas_size
+        self.canvas_rows = slice(
+            self.canvas_top, self.canvas_top + self.canvas_height
+        )
+        self.canvas_cols = slice(
+            self.canvas_left, self.canvas_left + self.canvas_width
+        )
+
+        drawing_height = max(
+            1, int(self.canvas_height * self.CANVAS_DOWNSCALE)
+        )
+        drawing_width = max(1, int(self.canvas_width * self.CANVAS_DOWNSCALE))
+        self.canvas = np.empty(
+            (drawing_height, drawing_width, 3), dtype=np.uint8
+        )
+        self.canvas_mask = np.empty(
+            (drawing_height, drawing_width), dtype=np.uint8
+        )
+
+        self.display_canvas = np.empty(
+            (self.canvas_height, self.canvas_width, 3), dtype=np.uint8
+        )
+        self.display_canvas_mask = np.empty(
+            (self.canvas_height, self.canvas_width), dtype=np.uint8
+        )
+        self.fill_canvas_background()
+
+    def fill_canvas_background(self):
+        """Reset the canvas to an empty white board."""
+        # WHITE has the same value in every channel, so a plain byte fill
+        # is equivalent to broadcasting the tuple and much cheaper
+        self.canvas.fill(WHITE[0])
+        self.canvas_mask.fill(self.MASK_EMPTY)
+        self.canvas_dirty = True
+
+    def setup_frame_buffers(self):
+        """Preallocate per-frame buffers reused by the processing loop."""
+        self.flip_buffer = np.empty(
+            (self.camera.height, self.camera.width, 3), dtype=np.uint8
+        )
 
     def setup_menu(self):
         """Initialize the menu with proper positioning."""
@@ -137,103 +215,186 @@ class VirtualCanvas:
         if frame is None:
             return False
 
-        frame = cv.flip(frame, 1)  # Flip horizontally for mirror effect
+        # Every stage below draws into this one buffer in place, so the
+        # frame stays cache-resident from the flip until it is displayed.
+        # Stages must not replace it with a new array.
+
+        # Flip horizontally for mirror effect, reusing the output buffer.
+        # OpenCV reallocates it if the camera delivers a different size.
+        self.flip_buffer = self.cv_flip(frame, 1, dst=self.flip_buffer)
+        frame = self.flip_buffer
 
-        # Process the frame with the hand tracker
-        processed_frame = self.tracker.process_frame(frame)
+        # Update the hand landmarks; markers are drawn once the frame is
+        # composed so the canvas and menu never cover the cursor
+        self.tracker.process_frame(frame)
 
         # Get finger position and drawing state
-        index_pos, will_draw = self.get_finger_info(processed_frame)
+        index_pos, will_draw = self.tracker.get_index_and_draw(frame)
 
         if not will_draw:
             self.prev_pos = None
 
         if self.tracker.is_drawing_mode and will_draw:
-            self.handle_drawing(index_pos, processed_frame)
-
-        self.handle_ui_interaction(index_pos, processed_frame)
+            self.handle_drawing(index_pos, frame)
 
+        # Composite the board before the menu so the buttons drawn next
+        # land on top of it and the region is only written once per stage
         if self.show_canvas:
-            self.blend_canvas_onto_frame(processed_frame)
+            self.blend_canvas_onto_frame(frame)
 
-        cv.imshow("Virtual Canvas", processed_frame)
+        self.handle_ui_interaction(index_pos, frame)
 
-        return cv.waitKey(self.FRAME_DELAY) != self.ESC_KEY
+        self.tracker.draw_markers(frame)
 
-    def get_finger_info(self, frame):
-        """Extract finger position and drawing state."""
-        finger_pos = self.tracker.get_hand_position(frame)
-        index_pos = finger_pos.get(self.tracker.INDEX_FINGER_KEY, None)
+        self.show_frame(frame)
 
-        draw_modes = self.tracker.draw_modes
-        will_draw = draw_modes[0] if draw_modes else False
+        # Poll keys every frame, even when the window was not refreshed
+        return self.cv_wait_key(self.FRAME_DELAY) != self.ESC_KEY
 
-        return index_pos, will_draw
+    def show_frame(self, frame):
+        """Display the frame, skipping updates faster than the display rate."""
+        now = time.monotonic()
+        if now - self.last_show_time < self.DISPLAY_INTERVAL:
+            return
+
+        self.cv_imshow("Virtual Canvas", frame)
+        self.last_show_time = now
 
     def blend_canvas_onto_frame(self, frame):
-        """Blend the canvas onto the live video frame."""
-        canvas_y, canvas_x = self.canvas_origin
-        height, width = self.canvas_size
-
-        frame_region = frame[
-            canvas_y : canvas_y + height, canvas_x : canvas_x + width
-        ]
-        blended = cv.addWeighted(
-            src1=frame_region,
-            alpha=self.FRAME_WEIGHT,
-            src2=self.canvas,
-            beta=self.CANVAS_WEIGHT,
-            gamma=self.BRIGHTNESS_ADJUSTMENT,
+        """Composite the drawn canvas pixels onto the live video frame."""
+        if self.canvas_dirty:
+            self.update_display_canvas()
+
+        # The region is a view into frame, so copying into it writes the
+        # strokes straight back; pixels outside the mask are left untouched
+        frame_region = frame[self.canvas_rows, self.canvas_cols]
+        self.cv_copy_to(
+            self.display_canvas, self.display_canvas_mask, dst=frame_region
+        )
+
+        self.cv_rectangle(
+            img=frame,
+            pt1=(self.canvas_left, self.canvas_top),
+            pt2=(
+                self.canvas_left + self.canvas_width - 1,
+                self.canvas_top + self.canvas_height - 1,
+            ),
+            color=WHITE,
+            thickness=self.CANVAS_BORDER_THICKNESS,
+        )
+
+    def update_display_canvas(self):
+        """Upscale the drawing canvas and its mask to the on-screen size."""
+        display_size = (self.canvas_width, self.canvas_height)
+
+        # Both use nearest so each output pixel takes its colour and its
+        # mask from the same canvas pixel; linear colour would pull in the
+        # neighbours' (or erased strokes') colours as a halo at the edges
+        self.cv_resize(
+            self.canvas,
+            display_size,
+            dst=self.display_canvas,
+            interpolation=cv.INTER_NEAREST,
         )
-        frame[canvas_y : canvas_y + height, canvas_x : canvas_x + width] = (
-            blended
+        self.cv_resize(
+            self.canvas_mask,
+            display_size,
+            dst=self.display_canvas_mask,
+            interpolation=cv.INTER_NEAREST,
         )
+        self.canvas_dirty = False
 
     def handle_drawing(self, finger_pos, frame):
         """Handle drawing operations on the canvas."""
         if not self.show_canvas or not finger_pos:
             return
 
-        canvas_x = finger_pos[0] - self.canvas_origin[1]
-        canvas_y = finger_pos[1] - self.canvas_origin[0]
+        canvas_x = finger_pos[0] - self.canvas_left
+        canvas_y = finger_pos[1] - self.canvas_top
 
-        if not self.is_within_canvas(canvas_x, canvas_y):
+        # Bounds check inlined, this runs on every drawing frame
+        if not (
+            0 <= canvas_x < self.canvas_width
+            and 0 <= canvas_y < self.canvas_height
+        ):
             self.prev_pos = None
             return
 
         self.draw_on_canvas(canvas_x, canvas_y)
 
-    def is_within_canvas(self, canvas_x, canvas_y):
-        """Check if the canvas_x and canvas_y are within canvas bounds."""
-        return (
-            0 <= canvas_x < self.canvas_size[1]
-            and 0 <= canvas_y < self.canvas_size[0]
-        )
-
     def draw_on_canvas(self, canvas_x, canvas_y):
         """Draw or erase on the canvas at the given canvas coordinates."""
+        current_pos = (canvas_x, canvas_y)
+
         if self.prev_pos is None:
-            self.prev_pos = (canvas_x, canvas_y)
+            self.prev_pos = current_pos
+        elif current_pos == self.prev_pos:
+            return  # Finger has not moved, this spot is already painted
+
+        start = self.scale_to_drawing(self.prev_pos)
+        end = self.scale_to_drawing(current_pos)
 
         if self.is_eraser:
-            cv.circle(
-                img=self.canvas,
-                center=(canvas_x, canvas_y),
-                radius=self.brush_size * self.ERASER_BRUSH_MULTIPLIER,
-                color=WHITE,
-                thickness=cv.FILLED,
-            )
+            self.erase_on_canvas(start, end)
 
         if not self.is_eraser:
-            cv.line(
+            thickness = self.scale_brush(self.brush_size)
+            self.cv_line(
                 img=self.canvas,
-                pt1=self.prev_pos,
-                pt2=(canvas_x, canvas_y),
+                pt1=start,
+                pt2=end,
                 color=self.current_color,
-                thickness=self.brush_size,
+                thickness=thickness,
+            )
+            self.cv_line(
+                img=self.canvas_mask,
+                pt1=start,
+                pt2=end,
+                color=self.MASK_DRAWN,
+                thickness=thickness,
             )
 
-        self.prev_pos = (canvas_x, canvas_y)
+        self.prev_pos = current_pos
+        self.canvas_dirty = True
+
+    def scale_to_drawing(self, canvas_pos):
+        """Map on-screen canvas coordinates to drawing canvas coordinates."""
+        return (
+            int(canvas_pos[0] * self.CANVAS_DOWNSCALE),
+            int(canvas_pos[1] * self.CANVAS_DOWNSCALE),
+        )
+
+    def scale_brush(self, size):
+        """Scale an on-screen brush size to the drawing canvas resolution."""
+        return max(1, int(size * self.CANVAS_DOWNSCALE))
+
+    def erase_on_canvas(self, start, end):
+        """Erase along the path between two drawing canvas positions."""
+        # Only the mask needs clearing, hidden canvas pixels are never shown
+        radius = self.scale_brush(
+            self.brush_size * self.ERASER_BRUSH_MULTIPLIER
+        )
+
+        if start == end:
+            self.cv_circle(
+                img=self.canvas_mask,
+                center=end,
+                radius=radius,
+                color=self.MASK_EMPTY,
+                thickness=cv.FILLED,
+            )
+            return
+
+        # A thick line has round caps, so one stroke covers the same area
+        # as a circle at every point along the path
+        self.cv_line(
+            img=self.canvas_mask,
+            pt1=start,
+            pt2=end,
+            color=self.MASK_EMPTY,
+            thickness=radius * 2,
+            lineType=cv.LINE_8,
+        )
 
     def handle_ui_interaction(self, finger_pos, frame):
         """Handle interactions with UI buttons."""
@@ -280,19 +441,19 @@ class VirtualCanvas:
 
     def select_color(self, button):
         """Select a new color from the color button pressed."""
-        if button in self.menu.color_buttons:
+        if self.menu.is_color_button(button):
             self.current_color = button.color
             self.is_eraser = False
 
     def select_size(self, button):
         """Change the brush size based on the selected pen size button."""
-        if button in self.menu.pen_size_buttons:
+        if self.menu.is_pen_size_button(button):
             self.brush_size = button.value
 
     def clear_canvas(self, button):
         """Clear the entire canvas when the clear button is pressed."""
         if button == self.menu.clear_button:
-            self.canvas[:] = WHITE
+            self.fill_canvas_background()
 
     def run(self):
         """Main application loop."""
@@ -302,6 +463,7 @@ class VirtualCanvas:
             pass  # Keep processing frames
 
         self.camera.stop()
+        self.tracker.close()
         cv.destroyAllWindows()
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 import cv2 as cv
+import numpy as np
 import threading
+import time
 
 class Camera:
     """
@@ -10,6 +12,10 @@ class Camera:
     DEFAULT_CAMERA_INDEX = 0
     DEFAULT_WIDTH = 1280
     DEFAULT_HEIGHT = 720
+    BUFFER_SIZE = 1  # Number of frames the driver may queue
+    GRAB_IDLE_DELAY = 0.001  # Seconds to back off between grabs
+    DROP_REPORT_INTERVAL = 5  # Seconds between dropped-frame reports
+    FALLBACK_FPS = 30  # Assumed frame rate when the driver reports none
 
     def __init__(
         self,
@@ -23,11 +29,30 @@ class Camera:
         self.height = height
         self.cap = None
 
+        # Two reusable frame buffers: one handed out, one being decoded into
+        self.slots = None
+        self.read_idx = 0
+        self.write_idx = 1
+
         # Threading-related attributes
-        self.latest_frame = None
+        self.has_frame = False
         self.is_running = False
         self.capture_thread = None
         self.frame_lock = threading.Lock()
+        self.retrieve_pending = threading.Event()
+
+        # Latest-wins bookkeeping: a grabbed frame that is replaced before
+        # anyone retrieves it counts as dropped
+        self.frame_ready = threading.Event()
+        self.dropped_frames = 0
+        self.reported_dropped_frames = 0
+        self.last_drop_report_time = time.monotonic()
+
+        # Single-frame reads skip a queued frame when the caller fell
+        # behind and the driver keeps more than one frame buffered
+        self.has_small_buffer = False
+        self.frame_interval = 1.0 / self.FALLBACK_FPS
+        self.last_read_time = None
 
     def open(self):
         """Open the camera and set frame properties."""
@@ -37,25 +62,75 @@ class Camera:
             error_msg = f"Cannot open camera with index {self.camera_index}"
             raise RuntimeError(error_msg)
 
+        # MJPG decodes faster than YUYV on most UVC webcams
+        self.cap.set(cv.CAP_PROP_FOURCC, cv.VideoWriter_fourcc(*"MJPG"))
         self.cap.set(cv.CAP_PROP_FRAME_WIDTH, self.width)
         self.cap.set(cv.CAP_PROP_FRAME_HEIGHT, self.height)
 
+        # Keep only the newest frame in the driver queue to avoid lag
+        self.has_small_buffer = self.cap.set(
+            cv.CAP_PROP_BUFFERSIZE, self.BUFFER_SIZE
+        )
+        if not self.has_small_buffer:
+            print(f"Warning: could not set buffer size to {self.BUFFER_SIZE}")
+
+        fps = self.cap.get(cv.CAP_PROP_FPS)
+        self.frame_interval = 1.0 / (fps if fps > 0 else self.FALLBACK_FPS)
+
+        self.slots = [
+            np.empty((self.height, self.width, 3), dtype=np.uint8),
+            np.empty((self.height, self.width, 3), dtype=np.uint8),
+        ]
+
     def update_frame(self):
-        """Continuously capture frames in a background thread."""
+        """Continuously grab frames in a background thread."""
         while self.is_running:
-            self.capture_single_frame()
+            # Back off so a waiting consumer can take the lock between grabs
+            if self.retrieve_pending.is_set():
+                time.sleep(self.GRAB_IDLE_DELAY)
+                continue
+
+            if not self.capture_single_frame():
+                time.sleep(self.GRAB_IDLE_DELAY)
+
+            self.report_dropped_frames()
 
     def capture_single_frame(self):
-        """Capture a single frame (helper for _update_frame)."""
+        """
+        Grab a single frame without decoding it (helper for update_frame).
+        The frame is only decoded when a consumer asks for it.
+        """
         if self.cap is None or not self.cap.isOpened():
+            return False
+
+        with self.frame_lock:
+            if not self.cap.grab():
+                return False
+
+            if self.frame_ready.is_set():
+                self.dropped_frames += 1
+
+            self.has_frame = True
+            self.frame_ready.set()
+
+        return True
+
+    def report_dropped_frames(self):
+        """Periodically print how many frames were skipped as stale."""
+        now = time.monotonic()
+        if now - self.last_drop_report_time < self.DROP_REPORT_INTERVAL:
             return
 
-        ret, frame = self.cap.read()
-        if not ret:
+        self.last_drop_report_time = now
+        new_drops = self.dropped_frames - self.reported_dropped_frames
+        if not new_drops:
             return
 
-        with self.frame_lock:
-            self.latest_frame = frame
+        self.reported_dropped_frames = self.dropped_frames
+        print(
+            f"Camera: skipped {new_drops} stale frames "
+            f"in the last {self.DROP_REPORT_INTERVAL}s"
+        )
 
     def start(self):
         """Start background frame capture."""
@@ -78,24 +153,61 @@ class Camera:
         return self.get_immediate_frame()
 
     def get_latest_frame(self):
-        """Get the latest frame from background thread."""
+        """
+        Decode and return the latest frame grabbed by background thread.
+        The returned array is a reused buffer that is overwritten two calls
+        later, so callers must not keep references to it across frames.
+        """
+        self.retrieve_pending.set()
         with self.frame_lock:
-            if self.latest_frame is None:
+            self.retrieve_pending.clear()
+
+            if not self.has_frame:
                 raise RuntimeError("No frame available yet.")
 
-            return self.latest_frame.copy()
+            ret, frame = self.cap.retrieve(self.slots[self.write_idx])
+            if not ret:
+                raise RuntimeError("Failed to retrieve frame from camera.")
+
+            # OpenCV reallocates if the camera ignored the requested size
+            self.slots[self.write_idx] = frame
+            self.read_idx, self.write_idx = self.write_idx, self.read_idx
+
+            self.frame_ready.clear()
+            return self.slots[self.read_idx]
 
     def get_immediate_frame(self):
-        """Capture and return an immediate single frame."""
+        """
+        Capture and return an immediate single frame.
+        If the previous call was longer than a frame interval ago and the
+        driver may have queued frames meanwhile, the oldest is skipped.
+        """
         if self.cap is None or not self.cap.isOpened():
             raise RuntimeError("Camera is not opened.")
 
-        ret, frame = self.cap.read()
+        self.retrieve_pending.set()
+        with self.frame_lock:
+            self.retrieve_pending.clear()
+
+            if self.is_behind():
+                self.cap.grab()
+
+            ret, frame = self.cap.read()
+            self.last_read_time = time.monotonic()
+
         if not ret:
             raise RuntimeError("Failed to read frame from camera.")
 
         return frame
 
+    def is_behind(self):
+        """Check if a stale frame is likely waiting in the driver queue."""
+        if self.has_small_buffer or self.last_read_time is None:
+            return False
+
+        elapsed = time.monotonic() - self.last_read_time
+        return elapsed > self.frame_interval
+
     def stop(self):
         """Stop background frame capture and release resources."""
         if not self.is_running:
@@ -1,10 +1,42 @@
+import os
+import queue
+import threading
+import time
 import cv2 as cv
 import mediapipe as mp
+import numpy as np
 
 from modules.drawing import LIGHT_GRAY, DARKER_GRAY
 
+BaseOptions = mp.tasks.BaseOptions
+HandLandmarker = mp.tasks.vision.HandLandmarker
+HandLandmarkerOptions = mp.tasks.vision.HandLandmarkerOptions
+VisionRunningMode = mp.tasks.vision.RunningMode
+
+class HandState:
+    """
+    Landmarks and raised finger flags from one detection, built on the
+    thread that produced the result and never modified afterwards.
+    """
+
+    def __init__(self, landmarks, handedness, coords, raised):
+        self.landmarks = landmarks
+        self.handedness = handedness
+        self.coords = coords
+        self.raised = raised
+
 class HandTracker:
-    """Track hand landmarks and detect raised fingers using MediaPipe Hands."""
+    """
+    Track hand landmarks and detect raised fingers using the MediaPipe
+    Tasks HandLandmarker.
+    """
+
+    # Hand landmarker model bundle, see README for where to download it
+    MODEL_ASSET_PATH = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "models",
+        "hand_landmarker.task",
+    )
 
     # Drawing constants
     CIRCLE_TIP_RADIUS = 5
@@ -18,6 +50,16 @@ class HandTracker:
 
     SELECTED_HAND_INDEX = 0  # Only one hand is selected for drawing
 
+    # Frames are shrunk by this factor before detection; 1.0 disables it
+    INPUT_SCALE = 0.5
+
+    # How often the inference thread wakes up to check for shutdown
+    QUEUE_POLL_TIMEOUT = 0.1
+
+    # Reused detection input buffers: one queued, one being detected and
+    # one being filled by the next submission
+    INFERENCE_SLOTS = 3
+
     # Finger landmark indices
     # These indices correspond to the MediaPipe Hands landmark model
     # https://chuoling.github.io/mediapipe/solutions/hands.html
@@ -26,39 +68,147 @@ class HandTracker:
         MIDDLE_FINGER_KEY: {"MCP": 9, "PIP": 10, "DIP": 11, "TIP": 12},
     }
 
+    # The same indices as a (TIP, DIP, PIP, MCP) x finger table, with
+    # fingers ordered as in FINGER_NAMES, for vectorized raised checks
+    NUM_LANDMARKS = 21
+    FINGER_NAMES = (INDEX_FINGER_KEY, MIDDLE_FINGER_KEY)
+    FINGER_JOINT_INDICES = np.array(
+        [
+            [8, 12],  # TIP
+            [7, 11],  # DIP
+            [6, 10],  # PIP
+            [5, 9],  # MCP
+        ]
+    )
+    IS_INDEX_FINGER = np.array(FINGER_NAMES) == INDEX_FINGER_KEY
+
     def __init__(
         self,
         use_static_image_mode=False,
         max_num_hands=2,
         detection_conf=0.8,
         tracking_conf=0.85,
+        model_asset_path=MODEL_ASSET_PATH,
+        use_gpu=True,
+        input_scale=INPUT_SCALE,
     ):
-        """Initialize the hand tracker with MediaPipe Hands settings."""
-        self.hand_detector = mp.solutions.hands.Hands(
-            static_image_mode=use_static_image_mode,
-            max_num_hands=max_num_hands,
-            min_detection_confidence=detection_conf,
-            min_tracking_confidence=tracking_conf,
+        """
+        Initialize the hand tracker with MediaPipe HandLandmarker settings.
+        Video frames are handed to an inference thread and detected
+        asynchronously (LIVE_STREAM) so inference overlaps with drawing;
+        static image mode runs synchronously.
+        Inference runs on the GPU delegate when available, else on the CPU.
+        Frames are downscaled by input_scale before detection.
+        """
+        if not os.path.isfile(model_asset_path):
+            error_msg = f"Hand landmarker model not found: {model_asset_path}"
+            raise RuntimeError(error_msg)
+
+        self.is_live_stream = not use_static_image_mode
+        running_mode = (
+            VisionRunningMode.LIVE_STREAM
+            if self.is_live_stream
+            else VisionRunningMode.IMAGE
         )
 
+        detector_settings = {
+            "running_mode": running_mode,
+            "num_hands": max_num_hands,
+            "min_hand_detection_confidence": detection_conf,
+            "min_tracking_confidence": tracking_conf,
+            "result_callback": (
+                self.on_result if self.is_live_stream else None
+            ),
+        }
+
+        self.hand_detector = None
+        self.uses_gpu = False
+
+        if use_gpu:
+            try:
+                self.hand_detector = self.create_hand_detector(
+                    model_asset_path,
+                    BaseOptions.Delegate.GPU,
+                    detector_settings,
+                )
+                self.uses_gpu = True
+            except (RuntimeError, NotImplementedError) as e:
+                print(f"Warning: GPU delegate unavailable, using CPU: {e}")
+
+        if self.hand_detector is None:
+            self.hand_detector = self.create_hand_detector(
+                model_asset_path, BaseOptions.Delegate.CPU, detector_settings
+            )
+
+        # Written by the MediaPipe callback thread, read once per frame
+        self.latest_state = None
+        self.last_timestamp_ms = -1
+
+        # Reused BGR to RGB conversion output, sized on the first frame and
+        # only touched by the thread running detect()
+        self.input_scale = input_scale
+        self.rgb_buffer = None
+
+        # Scaled copies of submitted frames, sized on the first frame
+        self.scaled_buffers = [None] * self.INFERENCE_SLOTS
+
+        # Single slot hand-off of buffer indices to the inference thread;
+        # a newer frame replaces one that has not been picked up yet.
+        # Buffers return to free_slots once they are no longer needed.
+        self.frame_queue = queue.Queue(maxsize=1)
+        self.free_slots = queue.Queue()
+        for slot in range(self.INFERENCE_SLOTS):
+            self.free_slots.put_nowait(slot)
+        self.stop_event = threading.Event()
+        self.inference_thread = None
+
+        if self.is_live_stream:
+            self.inference_thread = threading.Thread(
+                target=self.run_inference, daemon=True
+            )
+            self.inference_thread.start()
+
         self.prev_index_up = False
         self.prev_middle_up = False
 
         self.is_clicked_prev = False
 
         self.hand_landmarks = None
+        self.hand_classifications = []
+
+        # (hands, 21, 3) landmark array and (hands, fingers) raised flags,
+        # taken from the latest HandState
+        self.current_state = None
+        self.hand_coords = np.empty((0, self.NUM_LANDMARKS, 3))
+        self.hand_raised = np.empty((0, len(self.FINGER_NAMES)), dtype=bool)
         self.is_drawing_mode = False
-        self.draw_modes = []
+        # Bit i is set while hand i is in drawing mode
+        self.draw_modes_mask = 0
+
+    def create_hand_detector(self, model_asset_path, delegate, settings):
+        """Create a hand landmarker that runs on the given delegate."""
+        options = HandLandmarkerOptions(
+            base_options=BaseOptions(
+                model_asset_path=model_asset_path, delegate=delegate
+            ),
+            **settings,
+        )
+        return HandLandmarker.create_from_options(options)
 
     def process_frame(self, image_bgr):
-        """Process a frame and return it with drawn landmarks."""
+        """
+        Update the landmarks and drawing modes from a frame.
+        Nothing is drawn; call draw_markers once the frame is composed.
+        """
         self.update_landmarks(image_bgr)
 
-        # Draw raised fingers if hands are detected
-        if self.hand_landmarks and self.hand_landmarks.multi_hand_landmarks:
-            self.draw_raised_fingers(image_bgr)
+        if self.has_landmarks():
+            self.update_drawing_mode(self.detect_raised_fingers())
 
-        return image_bgr
+    def draw_markers(self, image_bgr):
+        """Draw the raised finger markers into image_bgr in place."""
+        if self.has_landmarks():
+            self.draw_raised_fingers(image_bgr)
 
     def get_hand_position(self, image_bgr):
         """Get current finger positions for all hands, separated by index."""
@@ -66,147 +216,257 @@ class HandTracker:
         if not self.has_landmarks():
             return {}  # No hands detected return empty dict
 
-        selected_hand = self.hand_landmarks.multi_hand_landmarks[
-            self.SELECTED_HAND_INDEX
-        ]
+        selected_hand = self.hand_coords[self.SELECTED_HAND_INDEX]
 
         finger_positions = {}  # Dictionary to hold finger positions
 
         # Extract positions for each finger
         for finger_name, joint_names in self.FINGER_LANDMARKS.items():
-            tip = selected_hand.landmark[joint_names["TIP"]]
+            tip = selected_hand[joint_names["TIP"]]
             finger_positions[finger_name] = self.normalize_coordinates(
                 tip, image_bgr.shape
             )
 
         return finger_positions
 
+    def get_index_and_draw(self, image_bgr):
+        """
+        Return the selected hand's index finger tip position (or None)
+        and whether that hand is in drawing mode.
+        """
+        is_draw_mode = self.get_draw_mode_for_hand(self.SELECTED_HAND_INDEX)
+
+        if not self.has_landmarks():
+            return None, is_draw_mode
+
+        selected_hand = self.hand_coords[self.SELECTED_HAND_INDEX]
+        index_tip = self.FINGER_LANDMARKS[self.INDEX_FINGER_KEY]["TIP"]
+        tip = selected_hand[index_tip]
+
+        return self.normalize_coordinates(tip, image_bgr.shape), is_draw_mode
+
     def update_landmarks(self, image_bgr):
-        """Update hand landmarks from the current frame."""
-        image_rgb = cv.cvtColor(image_bgr, cv.COLOR_BGR2RGB)
-        self.hand_landmarks = self.hand_detector.process(image_rgb)
-        self.hand_classifications = self.hand_landmarks.multi_handedness or []
+        """
+        Submit the current frame and pick up the latest detection result.
+        In LIVE_STREAM mode the landmarker itself skips palm detection
+        while tracking holds, so every frame is submitted.
+        """
+        self.submit_frame(image_bgr)
+
+        # Take a single snapshot so one frame never mixes two results
+        state = self.latest_state
+        if state is None or state is self.current_state:
+            return
+
+        self.current_state = state
+        self.hand_landmarks = state.landmarks
+        self.hand_classifications = state.handedness
+        self.hand_coords = state.coords
+        self.hand_raised = state.raised
+
+    def submit_frame(self, image_bgr):
+        """Queue the frame for the inference thread, or detect it directly."""
+        if not self.is_live_stream:
+            if self.input_scale != 1.0:
+                image_bgr = self.scale_frame(image_bgr, 0)
+            self.detect(image_bgr)
+            return
+
+        # At most one buffer is queued and one is being detected, so one
+        # of the three is always free here
+        slot = self.free_slots.get_nowait()
+        self.scale_frame(image_bgr, slot)
+
+        # Only this thread puts, so once the stale frame is dropped the
+        # queue is guaranteed to have room
+        try:
+            stale_slot = self.frame_queue.get_nowait()
+        except queue.Empty:
+            pass
+        else:
+            self.free_slots.put_nowait(stale_slot)
+        self.frame_queue.put_nowait(slot)
+
+    def scale_frame(self, image_bgr, slot):
+        """
+        Shrink the frame by input_scale into the reused buffer for slot.
+        The frame is copied even when unscaled, since the canvas, menu and
+        markers are drawn into image_bgr while detection may still run.
+        """
+        buffer = self.scaled_buffers[slot]
+
+        if self.input_scale == 1.0:
+            if buffer is None or buffer.shape != image_bgr.shape:
+                buffer = np.empty_like(image_bgr)
+            np.copyto(buffer, image_bgr)
+        else:
+            # Landmarks are normalized to [0, 1], so detecting on a smaller
+            # frame needs no change when mapping them back to pixels
+            image_height, image_width = image_bgr.shape[:2]
+            scaled_size = (
+                max(1, int(image_width * self.input_scale)),
+                max(1, int(image_height * self.input_scale)),
+            )
+            buffer = cv.resize(
+                image_bgr,
+                scaled_size,
+                dst=buffer,
+                interpolation=cv.INTER_LINEAR,
+            )
+
+        self.scaled_buffers[slot] = buffer
+        return buffer
+
+    def run_inference(self):
+        """Feed queued frames to the hand landmarker until stopped."""
+        while not self.stop_event.is_set():
+            try:
+                slot = self.frame_queue.get(timeout=self.QUEUE_POLL_TIMEOUT)
+            except queue.Empty:
+                continue
+
+            try:
+                self.detect(self.scaled_buffers[slot])
+            finally:
+                self.free_slots.put_nowait(slot)
+
+    def detect(self, image_bgr):
+        """Submit an already scaled frame to the hand landmarker."""
+        # mp.Image copies the pixels, so the buffer can be reused right away
+        self.rgb_buffer = cv.cvtColor(
+            image_bgr, cv.COLOR_BGR2RGB, dst=self.rgb_buffer
+        )
+        mp_image = mp.Image(
+            image_format=mp.ImageFormat.SRGB, data=self.rgb_buffer
+        )
+
+        if not self.is_live_stream:
+            result = self.hand_detector.detect(mp_image)
+            self.latest_state = self.build_hand_state(result)
+            return
+
+        # LIVE_STREAM requires strictly increasing timestamps
+        timestamp_ms = max(
+            int(time.monotonic() * 1000), self.last_timestamp_ms + 1
+        )
+        self.last_timestamp_ms = timestamp_ms
+        self.hand_detector.detect_async(mp_image, timestamp_ms)
+
+    def on_result(self, result, output_image, timestamp_ms):
+        """Publish the latest result delivered by the hand landmarker."""
+        self.latest_state = self.build_hand_state(result)
+
+    def build_hand_state(self, result):
+        """Convert a landmarker result into a HandState."""
+        coords = np.array(
+            [
+                [(lm.x, lm.y, lm.z) for lm in hand]
+                for hand in result.hand_landmarks
+            ],
+            dtype=np.float64,
+        ).reshape(-1, self.NUM_LANDMARKS, 3)
+
+        return HandState(
+            result.hand_landmarks,
+            result.handedness,
+            coords,
+            self.check_fingers_raised(coords),
+        )
 
     def has_landmarks(self):
         """Check if valid landmarks exist."""
-        return self.hand_landmarks and self.hand_landmarks.multi_hand_landmarks
+        return bool(self.hand_landmarks)
 
     def draw_raised_fingers(self, image_bgr):
         """Draw circles on all raised fingers for each detected hand."""
-        raised_fingers = self.detect_raised_fingers()
-        self.update_drawing_mode(raised_fingers)
-
-        for hand_idx, landmark in enumerate(
-            self.hand_landmarks.multi_hand_landmarks
+        radius = self.CIRCLE_TIP_RADIUS
+        for coord, color, thickness in self.get_finger_tip_circles(
+            image_bgr.shape
         ):
-            self.draw_finger_tips_for_hand(
-                image_bgr, hand_idx, landmark, raised_fingers
-            )
-
-    def draw_finger_tips_for_hand(
-        self, image_bgr, hand_idx, landmark, raised_fingers
-    ):
-        """Draw raised finger tips for a specific hand based on index."""
-        is_draw_mode = self.get_draw_mode_for_hand(hand_idx)
-        self.draw_finger_tips(
-            image_bgr, landmark, raised_fingers[hand_idx], is_draw_mode
-        )
+            cv.circle(image_bgr, coord, radius, color, thickness)
 
     def get_draw_mode_for_hand(self, hand_idx):
         """Return whether the specific hand is in drawing mode."""
-        return (
-            self.draw_modes[hand_idx]
-            if hand_idx < len(self.draw_modes)
-            else False
-        )
+        return bool(self.draw_modes_mask & (1 << hand_idx))
 
     def update_drawing_mode(self, raised_fingers):
         """Check if the drawing mode is active based on raised fingers."""
-        self.draw_modes.clear()
+        draw_modes_mask = 0
 
-        for fingers in raised_fingers:
+        for hand_idx, fingers in enumerate(raised_fingers):
             index_up = fingers.get(self.INDEX_FINGER_KEY)
             middle_up = fingers.get(self.MIDDLE_FINGER_KEY)
 
-            is_drawing = index_up and not middle_up
-            self.draw_modes.append(is_drawing)
+            if index_up and not middle_up:
+                draw_modes_mask |= 1 << hand_idx
 
-    def draw_finger_tips(
-        self,
-        image_bgr,
-        landmark,
-        raised_fingers,
-        is_draw_mode,
-    ):
-        """Draw tips for raised fingers of a single hand."""
-        for finger_name, joint_names in self.FINGER_LANDMARKS.items():
-            if raised_fingers.get(finger_name):
-                tip = landmark.landmark[joint_names["TIP"]]
-                x_coord, y_coord = self.normalize_coordinates(
-                    tip, image_bgr.shape
-                )
-                self.draw_finger_tip(
-                    image_bgr, finger_name, (x_coord, y_coord), is_draw_mode
-                )
+        self.draw_modes_mask = draw_modes_mask
+
+    def get_finger_tip_circles(self, image_shape):
+        """
+        Return (coord, color, thickness) circles for every raised finger tip
+        of every hand, outlines first. Tips are filled unless they belong to
+        the index finger of a hand in drawing mode.
+        """
+        image_height, image_width, _ = image_shape
+
+        tip_xy = self.hand_coords[:, self.FINGER_JOINT_INDICES[0], :2]
+        tips = (tip_xy * (image_width, image_height)).astype(int)
 
-    def draw_finger_tip(self, image_bgr, finger_name, coord, is_draw_mode):
-        """Draw a single finger tip marker based on its hand's draw mode."""
-        cv.circle(
-            image_bgr,
-            coord,
-            self.CIRCLE_TIP_RADIUS,
-            self.OUTER_CIRCLE_TIP_COLOR,
-            self.OUTER_CIRCLE_TIP_THICKNESS,
+        draw_modes = np.array(
+            [self.get_draw_mode_for_hand(i) for i in range(len(tips))],
+            dtype=bool,
+        )
+        is_filled = self.hand_raised & ~(
+            draw_modes[:, None] & self.IS_INDEX_FINGER
         )
 
-        # Draw inner circle only if not in drawing mode and not the index finger
-        if not (is_draw_mode and finger_name == self.INDEX_FINGER_KEY):
-            cv.circle(
-                image_bgr,
-                coord,
-                self.CIRCLE_TIP_RADIUS,
+        circles = [
+            (
+                tuple(coord),
+                self.OUTER_CIRCLE_TIP_COLOR,
+                self.OUTER_CIRCLE_TIP_THICKNESS,
+            )
+            for coord in tips[self.hand_raised].tolist()
+        ]
+        circles += [
+            (
+                tuple(coord),
                 self.INNER_CIRCLE_TIP_COLOR,
                 self.INNER_CIRCLE_TIP_FILL,
             )
+            for coord in tips[is_filled].tolist()
+        ]
+        return circles
 
     def detect_raised_fingers(self):
         """Detect raised fingers for all hands."""
         if not self.has_landmarks():
             return []  # No hands detected return empty list
 
-        return [
-            self.check_hand_fingers(hand)
-            for hand in self.hand_landmarks.multi_hand_landmarks
-        ]
+        return [self.check_hand_fingers(raised) for raised in self.hand_raised]
 
-    def check_hand_fingers(self, hand_landmark):
-        """Check which fingers are raised for a single hand."""
-        return {
-            finger_name: self.is_finger_raised(hand_landmark, joints)
-            for finger_name, joints in self.FINGER_LANDMARKS.items()
-        }
+    def check_hand_fingers(self, raised):
+        """Map a hand's raised flags to a finger name dictionary."""
+        return dict(zip(self.FINGER_NAMES, raised.tolist()))
 
-    def is_finger_raised(self, hand_landmark, joints):
-        """Check if a single finger is raised."""
-        y_coords = {
-            key: hand_landmark.landmark[joints[key]].y
-            for key in ["TIP", "DIP", "PIP", "MCP"]
-        }
+    def check_fingers_raised(self, coords):
+        """
+        Check which fingers are raised for every hand at once, returning a
+        (hands, fingers) array in FINGER_NAMES order. A finger is raised
+        when its joints rise from MCP up to the TIP.
+        """
+        joint_y = coords[:, self.FINGER_JOINT_INDICES, 1]
+        tip, dip, pip, mcp = joint_y.transpose(1, 0, 2)
+        return (tip < dip) & (dip < pip) & (pip < mcp)
 
-        return (
-            y_coords["TIP"]
-            < y_coords["DIP"]
-            < y_coords["PIP"]
-            < y_coords["MCP"]
-        )
-
-    def normalize_coordinates(self, landmark, image_shape):
-        """Convert normalized coordinates to pixel coordinates."""
+    def normalize_coordinates(self, point, image_shape):
+        """Convert a normalized (x, y, ...) point to pixel coordinates."""
         image_height, image_width, _ = image_shape
 
         return (
-            int(landmark.x * image_width),
-            int(landmark.y * image_height),
+            int(point[0] * image_width),
+            int(point[1] * image_height),
         )
 
     def toggle_drawing_mode(self):
@@ -218,24 +478,19 @@ class HandTracker:
         if not self.has_landmarks():
             return False  # No hands detected return False
 
-        hand = self.hand_landmarks.multi_hand_landmarks[
+        index_up, middle_up = self.get_current_finger_states(
             self.SELECTED_HAND_INDEX
-        ]
-        index_up, middle_up = self.get_current_finger_states(hand)
+        )
 
         click_happened = self.is_click_happening(index_up, middle_up)
         self.update_previous_states(index_up, middle_up, click_happened)
 
         return click_happened
 
-    def get_current_finger_states(self, hand):
+    def get_current_finger_states(self, hand_idx):
         """Get the current raised states of index and middle fingers."""
-        index_joints = self.FINGER_LANDMARKS[self.INDEX_FINGER_KEY]
-        middle_joints = self.FINGER_LANDMARKS[self.MIDDLE_FINGER_KEY]
-        return (
-            self.is_finger_raised(hand, index_joints),
-            self.is_finger_raised(hand, middle_joints),
-        )
+        index_up, middle_up = self.hand_raised[hand_idx].tolist()
+        return index_up, middle_up
 
     def is_click_happening(self, index_up, middle_up):
         """Determine if a click gesture occurred based on finger states."""
@@ -253,3 +508,11 @@ class HandTracker:
         self.prev_index_up = index_up
         self.prev_middle_up = middle_up
         self.is_clicked_prev = click_happened
+
+    def close(self):
+        """Stop the inference thread and release the hand landmarker."""
+        self.stop_event.set()
+        if self.inference_thread is not None:
+            self.inference_thread.join()
+
+        self.hand_detector.close()
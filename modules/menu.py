@@ -1,4 +1,5 @@
 import cv2 as cv
+import numpy as np
 from modules.drawing import COLORS, WHITE, LIGHT_GRAY, MID_GRAY, COLOR_OPTIONS
 
 # Text Display Constants
@@ -9,6 +10,19 @@ LABEL_MARGIN = 10
 LABEL_BOTTOM_MARGIN = 20
 LABEL_OUTLINE_WIDTH = 4
 
+def put_text(image, text, org, color):
+    """Draw UI text with the shared font settings and anti-aliasing."""
+    cv.putText(
+        img=image,
+        text=text,
+        org=org,
+        fontFace=FONT,
+        fontScale=TEXT_SCALE,
+        color=color,
+        thickness=TEXT_THICKNESS,
+        lineType=cv.LINE_AA,
+    )
+
 class CircleButton:
     """Represents a circular button element in the UI."""
 
@@ -26,6 +40,7 @@ class CircleButton:
         label="",
         is_pen=False,
         value=None,
+        color_name=None,
     ):
         self.center_x = center_x
         self.center_y = center_y
@@ -34,38 +49,37 @@ class CircleButton:
         self.label = label
         self.is_pen = is_pen
         self.value = value
+        self.color_name = color_name
+
+        # The label never changes, so measure it and place it only once
+        self.text_size = None
+        self.text_baseline = 0
+        self.label_org = None
+        if label:
+            self.text_size, self.text_baseline = cv.getTextSize(
+                label, FONT, TEXT_SCALE, TEXT_THICKNESS
+            )
+            self.label_org = (
+                center_x - self.text_size[0] // 2,
+                center_y + radius + self.text_size[1] + LABEL_MARGIN,
+            )
 
-    def draw(self, frame):
-        """Render the circular button with optional label."""
-        overlay = frame.copy()
-        center = (self.center_x, self.center_y)
-        cv.circle(overlay, center, self.radius, self.color, cv.FILLED)
-        cv.addWeighted(
-            src1=overlay,
-            alpha=self.OVERLAY_ALPHA,
-            src2=frame,
-            beta=self.BLEND_TOTAL_WEIGHT - self.OVERLAY_ALPHA,
-            gamma=self.BRIGHTNESS_ADJUSTMENT,
-            dst=frame,
-        )
+    def get_bounds(self):
+        """Return the (x0, y0, x1, y1) box covering the circle and label."""
+        x0 = self.center_x - self.radius
+        y0 = self.center_y - self.radius
+        x1 = self.center_x + self.radius + 1
+        y1 = self.center_y + self.radius + 1
 
-        if not self.label:
-            return
+        if self.label:
+            text_x, text_y = self.label_org
+            text_width, text_height = self.text_size
+            x0 = min(x0, text_x - TEXT_THICKNESS)
+            y0 = min(y0, text_y - text_height - TEXT_THICKNESS)
+            x1 = max(x1, text_x + text_width + TEXT_THICKNESS + 1)
+            y1 = max(y1, text_y + self.text_baseline + TEXT_THICKNESS + 1)
 
-        text_size = cv.getTextSize(
-            self.label, FONT, TEXT_SCALE, TEXT_THICKNESS
-        )[0]
-        text_x = self.center_x - text_size[0] // 2
-        text_y = self.center_y + self.radius + text_size[1] + LABEL_MARGIN
-        cv.putText(
-            img=frame,
-            text=self.label,
-            org=(text_x, text_y),
-            fontFace=FONT,
-            fontScale=TEXT_SCALE,
-            color=self.LABEL_COLOR,
-            thickness=TEXT_THICKNESS,
-        )
+        return x0, y0, x1, y1
 
     def is_over(self, x, y):
         """Return True if (x, y) is inside the button area."""
@@ -73,6 +87,104 @@ class CircleButton:
 
         return dx**2 + dy**2 < self.radius**2  # Squared distance check
 
+class MenuTile:
+    """
+    Pre-rendered buttons composited onto a frame within their bounding box.
+    The circles are blended at the buttons' overlay alpha with the labels
+    drawn on top. Anti-aliased labels are blended using their coverage as
+    alpha, so only the label pixels are gathered and written per frame.
+    """
+
+    MASK_ON = 255
+
+    def __init__(self, buttons, frame_shape):
+        """Render the buttons once into buffers cropped to their bounds."""
+        frame_height, frame_width = frame_shape[:2]
+        bounds = [button.get_bounds() for button in buttons]
+
+        self.x0 = max(min(box[0] for box in bounds), 0)
+        self.y0 = max(min(box[1] for box in bounds), 0)
+        self.x1 = min(max(box[2] for box in bounds), frame_width)
+        self.y1 = min(max(box[3] for box in bounds), frame_height)
+        self.is_empty = self.x0 >= self.x1 or self.y0 >= self.y1
+        if self.is_empty:
+            return  # Every button lies outside the frame
+
+        height, width = self.y1 - self.y0, self.x1 - self.x0
+        self.fill = np.zeros((height, width, 3), dtype=np.uint8)
+        self.fill_mask = np.zeros((height, width), dtype=np.uint8)
+        self.text = np.zeros((height, width, 3), dtype=np.uint8)
+        self.text_mask = np.zeros((height, width), dtype=np.uint8)
+        self.blend = np.empty((height, width, 3), dtype=np.uint8)
+
+        for button in buttons:
+            self.render_button(button)
+
+        # Labels drawn on black are premultiplied by their coverage, so
+        # compositing is frame * (1 - coverage) + text at label pixels
+        self.text_rows, self.text_cols = np.nonzero(self.text_mask)
+        coverage = self.text_mask[self.text_rows, self.text_cols] / 255.0
+        self.text_keep = (1.0 - coverage)[:, None]
+        self.text_pixels = self.text[self.text_rows, self.text_cols] + 0.5
+
+    def render_button(self, button):
+        """Render one button's circle and label into the tile buffers."""
+        center = (button.center_x - self.x0, button.center_y - self.y0)
+
+        # Premultiply by the overlay alpha so compositing needs one blend
+        fill_color = tuple(
+            round(channel * button.OVERLAY_ALPHA) for channel in button.color
+        )
+        cv.circle(self.fill, center, button.radius, fill_color, cv.FILLED)
+        cv.circle(
+            self.fill_mask, center, button.radius, self.MASK_ON, cv.FILLED
+        )
+
+        if not button.label:
+            return
+
+        org = (button.label_org[0] - self.x0, button.label_org[1] - self.y0)
+        put_text(self.text, button.label, org, button.LABEL_COLOR)
+        put_text(self.text_mask, button.label, org, self.MASK_ON)
+
+    def draw(self, frame):
+        """Composite the pre-rendered buttons onto the frame."""
+        if self.is_empty:
+            return
+
+        roi = frame[self.y0 : self.y1, self.x0 : self.x1]
+        cv.addWeighted(
+            src1=roi,
+            alpha=CircleButton.BLEND_TOTAL_WEIGHT - CircleButton.OVERLAY_ALPHA,
+            src2=self.fill,
+            beta=CircleButton.BLEND_TOTAL_WEIGHT,
+            gamma=CircleButton.BRIGHTNESS_ADJUSTMENT,
+            dst=self.blend,
+        )
+        cv.copyTo(self.blend, self.fill_mask, dst=roi)
+
+        under_text = roi[self.text_rows, self.text_cols]
+        roi[self.text_rows, self.text_cols] = (
+            under_text * self.text_keep + self.text_pixels
+        )
+
+class MenuLayer:
+    """
+    Static menu buttons pre-rendered into one tile per button.
+    The buttons are spread across the frame, so separate tiles keep the
+    per-frame blend to the pixels around each button.
+    """
+
+    def __init__(self, buttons, frame_shape):
+        """Render a tile for each button that lies inside the frame."""
+        tiles = (MenuTile([button], frame_shape) for button in buttons)
+        self.tiles = [tile for tile in tiles if not tile.is_empty]
+
+    def draw(self, frame):
+        """Composite every pre-rendered tile onto the frame."""
+        for tile in self.tiles:
+            tile.draw(frame)
+
 class Menu:
     """UI Manager for all on-screen buttons in the drawing app."""
 
@@ -105,6 +217,10 @@ class Menu:
         self.pen_toggle_pos = pen_toggle_pos
         self.last_message = ""
 
+        # Position of last_message, re-measured only when it changes
+        self.message_origin_key = None
+        self.message_origin = None
+
         self.clear_button_pos = (
             pen_toggle_pos[0] - self.CLEAR_OFFSET_X,
             pen_toggle_pos[1],
@@ -120,9 +236,25 @@ class Menu:
 
         self.color_buttons = []
         self.pen_size_buttons = []
+        self.pen_size_sprites = []
         self.shape_buttons = []
         self.clear_button = None
         self.current_hover = None
+
+        # Lookups built once in create_buttons, buttons never change after
+        self.all_buttons = ()
+        self.color_button_ids = frozenset()
+        self.pen_size_button_ids = frozenset()
+
+        # Button geometry as parallel arrays for one vectorized hit test
+        self.button_centers_x = None
+        self.button_centers_y = None
+        self.button_radii_sq = None
+
+        # Static buttons pre-rendered for the current visibility state
+        self.menu_layer = None
+        self.menu_layer_key = None
+
         self.create_buttons()
 
     def create_buttons(self):
@@ -132,6 +264,44 @@ class Menu:
         self.create_shape_buttons()
         self.create_clear_button()
         self.create_toggle_buttons()
+        self.cache_button_lookups()
+
+    def cache_button_lookups(self):
+        """Cache the full button list and the category membership sets."""
+        self.all_buttons = (
+            self.clear_button,
+            *self.color_buttons,
+            *self.pen_size_buttons,
+            *self.shape_buttons,
+            self.board_toggle,
+            self.pen_toggle,
+            self.color_toggle,
+            self.eraser_toggle,
+        )
+        self.color_button_ids = frozenset(map(id, self.color_buttons))
+        self.pen_size_button_ids = frozenset(map(id, self.pen_size_buttons))
+
+        self.button_centers_x = np.array(
+            [button.center_x for button in self.all_buttons], dtype=np.int32
+        )
+        self.button_centers_y = np.array(
+            [button.center_y for button in self.all_buttons], dtype=np.int32
+        )
+        self.button_radii_sq = np.array(
+            [button.radius**2 for button in self.all_buttons], dtype=np.int32
+        )
+
+        # Buttons changed, so any pre-rendered layer is stale
+        self.menu_layer = None
+        self.menu_layer_key = None
+
+    def is_color_button(self, button):
+        """Return True if the button is one of the color buttons."""
+        return id(button) in self.color_button_ids
+
+    def is_pen_size_button(self, button):
+        """Return True if the button is one of the pen size buttons."""
+        return id(button) in self.pen_size_button_ids
 
     def create_color_buttons(self):
         """Create buttons for color selection."""
@@ -143,6 +313,7 @@ class Menu:
                 self.color_toggle_pos[1],
                 self.BUTTON_RADIUS,
                 color,
+                color_name=COLOR_OPTIONS.get(color, str(color)),
             )
             for index, color in enumerate(
                 [c for c in COLORS if c != WHITE][: self.MAX_COLORS]
@@ -168,6 +339,39 @@ class Menu:
             for index, size in enumerate(sizes)
         ]
 
+        # The buttons look the same every frame, so draw them only once
+        self.pen_size_sprites = [
+            self.render_pen_size_sprite(button)
+            for button in self.pen_size_buttons
+        ]
+
+    def render_pen_size_sprite(self, button):
+        """
+        Render a pen size button with its outline and label into a sprite.
+        Return (x, y, sprite, mask) with the sprite's top-left frame corner.
+        """
+        outer_radius = button.radius + LABEL_OUTLINE_WIDTH
+        size = 2 * outer_radius + 1
+        center = (outer_radius, outer_radius)
+
+        sprite = np.zeros((size, size, 3), dtype=np.uint8)
+        mask = np.zeros((size, size), dtype=np.uint8)
+        cv.circle(sprite, center, outer_radius, WHITE, cv.FILLED)
+        cv.circle(sprite, center, button.radius, button.color, cv.FILLED)
+        cv.circle(mask, center, outer_radius, MenuTile.MASK_ON, cv.FILLED)
+
+        # The label sits on the opaque fill, so its anti-aliased edges can
+        # be drawn straight into the sprite
+        if button.label:
+            self.draw_label(sprite, button.label, *center, button.text_size)
+
+        return (
+            button.center_x - outer_radius,
+            button.center_y - outer_radius,
+            sprite,
+            mask,
+        )
+
     def create_shape_buttons(self):
         """Create buttons for different shapes."""
         self.shape_buttons = []
@@ -213,92 +417,93 @@ class Menu:
 
     def draw_ui(self, app, frame):
         """Draw all UI elements on the provided frame."""
-        self.board_toggle.draw(frame)
+        self.get_menu_layer(app, frame).draw(frame)
         if not app.show_canvas:
             return
 
-        self.draw_main_controls(frame)
-
-        if app.show_colors:
-            self.draw_color_buttons(frame)
-
         if app.show_brush_sizes:
             self.draw_pen_size_buttons(frame)
 
         if self.last_message:
             self.draw_status_message(frame)
 
-    def draw_main_controls(self, frame):
-        """Draw the main control buttons on the frame."""
-        for button in [
+    def get_menu_layer(self, app, frame):
+        """Return the pre-rendered static buttons, rebuilding on changes."""
+        key = (app.show_canvas, app.show_colors, frame.shape)
+        if key != self.menu_layer_key:
+            self.menu_layer = MenuLayer(
+                self.get_layer_buttons(app), frame.shape
+            )
+            self.menu_layer_key = key
+
+        return self.menu_layer
+
+    def get_layer_buttons(self, app):
+        """Return the static buttons visible in the current app state."""
+        buttons = [self.board_toggle]
+        if not app.show_canvas:
+            return buttons
+
+        buttons += [
             self.clear_button,
             self.pen_toggle,
             self.color_toggle,
             self.eraser_toggle,
-        ]:
-            button.draw(frame)
+        ]
+
+        if app.show_colors:
+            buttons += self.color_buttons
 
-    def draw_color_buttons(self, frame):
-        """Draw the color selection buttons."""
-        for button in self.color_buttons:
-            button.draw(frame)
+        return buttons
 
     def draw_pen_size_buttons(self, frame):
         """Draw the pen size buttons with labels."""
-        for button in self.pen_size_buttons:
-            cv.circle(
-                img=frame,
-                center=(button.center_x, button.center_y),
-                radius=button.radius + LABEL_OUTLINE_WIDTH,
-                color=WHITE,
-                thickness=cv.FILLED,
-            )
-            cv.circle(
-                img=frame,
-                center=(button.center_x, button.center_y),
-                radius=button.radius,
-                color=button.color,
-                thickness=cv.FILLED,
+        frame_height, frame_width = frame.shape[:2]
+
+        for x, y, sprite, mask in self.pen_size_sprites:
+            sprite_height, sprite_width = mask.shape
+            x0, y0 = max(x, 0), max(y, 0)
+            x1 = min(x + sprite_width, frame_width)
+            y1 = min(y + sprite_height, frame_height)
+            if x0 >= x1 or y0 >= y1:
+                continue  # Button lies entirely outside the frame
+
+            # Clip the sprite to the part that lands inside the frame
+            rows = slice(y0 - y, y1 - y)
+            cols = slice(x0 - x, x1 - x)
+            cv.copyTo(
+                sprite[rows, cols],
+                mask[rows, cols],
+                dst=frame[y0:y1, x0:x1],
             )
 
-            if button.label:
-                self.draw_label(
-                    frame, button.label, button.center_x, button.center_y
-                )
+    def draw_label(self, frame, text, center_x, center_y, text_size=None):
+        """
+        Draw a label centered at the specified coordinates.
+        Pass a cached text_size to skip measuring the text again.
+        """
+        if text_size is None:
+            text_size = cv.getTextSize(
+                text, FONT, TEXT_SCALE, TEXT_THICKNESS
+            )[0]
 
-    def draw_label(self, frame, text, center_x, center_y):
-        """Draw a label centered at the specified coordinates."""
-        text_size = cv.getTextSize(text, FONT, TEXT_SCALE, TEXT_THICKNESS)[0]
         text_x = center_x - text_size[0] // 2
         text_y = center_y + text_size[1] // 2
-        cv.putText(
-            frame,
-            text,
-            (text_x, text_y),
-            FONT,
-            TEXT_SCALE,
-            WHITE,
-            TEXT_THICKNESS,
-            cv.LINE_AA,
-        )
+        put_text(frame, text, (text_x, text_y), WHITE)
 
     def draw_status_message(self, frame):
         """Display the last message at the bottom of the frame."""
-        text_size = cv.getTextSize(
-            self.last_message, FONT, TEXT_SCALE, TEXT_THICKNESS
-        )[0]
-        text_x = frame.shape[1] - text_size[0] - LABEL_BOTTOM_MARGIN
-        text_y = frame.shape[0] - LABEL_BOTTOM_MARGIN
-        cv.putText(
-            frame,
-            self.last_message,
-            (text_x, text_y),
-            FONT,
-            TEXT_SCALE,
-            WHITE,
-            TEXT_THICKNESS,
-            cv.LINE_AA,
-        )
+        key = (self.last_message, frame.shape)
+        if key != self.message_origin_key:
+            text_size = cv.getTextSize(
+                self.last_message, FONT, TEXT_SCALE, TEXT_THICKNESS
+            )[0]
+            text_x = frame.shape[1] - text_size[0] - LABEL_BOTTOM_MARGIN
+            text_y = frame.shape[0] - LABEL_BOTTOM_MARGIN
+            self.message_origin = (text_x, text_y)
+            self.message_origin_key = key
+
+        put_text(frame, self.last_message, self.message_origin, WHITE)
 
     def handle_interaction(self, finger_pos, is_clicking):
         """Handle button interactions based on finger position."""
@@ -306,51 +511,42 @@ class Menu:
             self.current_hover = None
             return None
 
-        for button in self.get_all_buttons():
-            if not button.is_over(finger_pos[0], finger_pos[1]):
-                continue
+        button = self.find_button_at(finger_pos[0], finger_pos[1])
+        self.current_hover = button
 
-            self.current_hover = button
+        # If no button is hovered or it is not clicked, just exit the method
+        if button is None or not is_clicking:
+            return None
 
-            # If the button is not clicked, just exit the method
-            if not is_clicking:
-                return None
+        # If the button clicked is a color button,
+        # update the last message with the color name
+        if self.is_color_button(button):
+            self.last_message = f"Selected Color: {button.color_name}"
 
-            # If the button is not in the list of buttons,
-            # clear the last message
-            if button not in self.get_all_buttons():
-                self.last_message = ""
+        # If the button clicked is a pen size button,
+        # update the last message with the pen size
+        if self.is_pen_size_button(button):
+            self.last_message = f"Pen Thickness: {button.value}"
 
-            # If the button clicked is a color button,
-            # update the last message with the color name
-            if button in self.color_buttons:
-                name = COLOR_OPTIONS.get(tuple(button.color), str(button.color))
-                self.last_message = f"Selected Color: {name}"
+        # If the button clicked is a shape button,
+        # update the last message with the shape label
+        if button == self.eraser_toggle:
+            self.last_message = "Eraser Selected"
 
-            # If the button clicked is a pen size button,
-            # update the last message with the pen size
-            if button in self.pen_size_buttons:
-                self.last_message = f"Pen Thickness: {button.value}"
+        return button
 
-            # If the button clicked is a shape button,
-            # update the last message with the shape label
-            if button == self.eraser_toggle:
-                self.last_message = "Eraser Selected"
+    def find_button_at(self, x, y):
+        """Return the first button containing (x, y), or None."""
+        dx = x - self.button_centers_x
+        dy = y - self.button_centers_y
+        hits = dx * dx + dy * dy < self.button_radii_sq  # Squared distance
 
-            return button
+        hit_idx = int(np.argmax(hits))  # First hit, in all_buttons order
+        if not hits[hit_idx]:
+            return None
 
-        self.current_hover = None
-        return None
+        return self.all_buttons[hit_idx]
 
     def get_all_buttons(self):
-        """return a list of all buttons in the menu."""
-        return [
-            self.clear_button,
-            *self.color_buttons,
-            *self.pen_size_buttons,
-            *self.shape_buttons,
-            self.board_toggle,
-            self.pen_toggle,
-            self.color_toggle,
-            self.eraser_toggle,
-        ]
+        """return a tuple of all buttons in the menu."""
+        return self.all_buttons